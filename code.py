@@ -1,84 +1,662 @@
-"""MacOS automation MCP server built with FastMCP."""
+"""MacOS automation MCP server built with FastMCP.
+
+Environment variables:
+
+``MCP_PAUSE_MS``
+    Delay PyAutoGUI inserts after every call, in milliseconds (default ``0``).
+``MCP_USE_UVLOOP``
+    Set to ``0`` to keep asyncio's default event loop instead of :mod:`uvloop`.
+    uvloop is installed as the process-wide event loop policy at import time,
+    and only on Python < 3.14: event loop policies are deprecated from 3.14 and
+    uvloop's ``EventLoopPolicy`` is slated for removal with them.
+"""
 
 from __future__ import annotations
 
-import base64
-import importlib
+import asyncio
+import atexit
+import functools
+import hashlib
+import inspect
 import io
-import subprocess
+import math
+import os
 import sys
 import tempfile
+import threading
+import time
+import typing
+from collections import OrderedDict
 from pathlib import Path
 from types import ModuleType
-from typing import List, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple
 
 from fastmcp import FastMCP
+from fastmcp.utilities.types import Image
+from pydantic import TypeAdapter, ValidationError
 
-_pyautogui_spec = importlib.util.find_spec("pyautogui")
-if _pyautogui_spec is not None:
-    pyautogui = importlib.import_module("pyautogui")
-else:  # pragma: no cover - informative import failure
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    import PIL.Image
+
+try:
+    import pyautogui
+except ImportError:  # pragma: no cover - informative import failure
     pyautogui = None
 
+# pybase64 wraps a SIMD base64 codec; the stdlib module is a scalar fallback.
+try:
+    import pybase64 as _b64
+except ImportError:  # pragma: no cover - optional dependency
+    import base64 as _b64
+
+# pybase64 can write the ASCII ``str`` directly, skipping a bytes -> str copy.
+_b64encode_as_string = getattr(_b64, "b64encode_as_string", None)
+
+# Optional PNG encoders tried before Pillow's zlib encoder. fpng is much faster;
+# only the ``pyspng-seunglab`` fork of pyspng can encode (PyPI pyspng only loads).
+try:
+    import fpng_py as _fpng
+except ImportError:  # pragma: no cover - optional dependency
+    _fpng = None
+
+try:
+    import numpy as _np
+    import pyspng as _pyspng
+except ImportError:  # pragma: no cover - optional dependency
+    _pyspng = None
+if not hasattr(_pyspng, "encode"):
+    _pyspng = None
+
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:  # pragma: no cover - optional dependency
+    _blake3 = None
+
+# Quartz (PyObjC) lets repeated clicks be posted without PyAutoGUI's per-click overhead.
+try:
+    import Quartz as _quartz
+except ImportError:  # pragma: no cover - optional dependency
+    _quartz = None
+
+if _quartz is not None:
+    _QUARTZ_BUTTONS = {
+        "left": (_quartz.kCGEventLeftMouseDown, _quartz.kCGEventLeftMouseUp, _quartz.kCGMouseButtonLeft),
+        "right": (_quartz.kCGEventRightMouseDown, _quartz.kCGEventRightMouseUp, _quartz.kCGMouseButtonRight),
+        "middle": (_quartz.kCGEventOtherMouseDown, _quartz.kCGEventOtherMouseUp, _quartz.kCGMouseButtonCenter),
+    }
+
+_FAST_PNG_CHANNELS = {"RGB": 3, "RGBA": 4}
+
+ImageFormat = Literal["png", "jpeg", "webp"]
+
+# Recently encoded screenshots, keyed by region, format and a frame identity
+# (a pixel digest, or the ScreenCaptureKit frame number).
+_SCREENSHOT_CACHE_SIZE = 4
+_screenshot_cache: OrderedDict[tuple, bytes] = OrderedDict()
+_screenshot_cache_lock = threading.Lock()
+
+_DATA_URL_PREFIXES = {
+    "png": "data:image/png;base64,",
+    "jpeg": "data:image/jpeg;base64,",
+    "webp": "data:image/webp;base64,",
+}
+
+# ``screencapture -t`` types for formats it can write itself.
+_SCREENCAPTURE_TYPES = {"png": "png", "jpeg": "jpg"}
+
+# ScreenCaptureKit stream settings.
+_SCREEN_STREAM_FPS = 30
+_SCREEN_STREAM_TIMEOUT = 2.0
+# Backoff (seconds) before retrying a stream whose setup failed transiently.
+_SCREEN_STREAM_RETRY_INITIAL = 1.0
+_SCREEN_STREAM_RETRY_MAX = 30.0
+
+
+def _pause_from_environment() -> float:
+    """Return the ``MCP_PAUSE_MS`` delay in seconds (``0`` when unset)."""
+
+    value = os.environ.get("MCP_PAUSE_MS", "").strip()
+    if not value:
+        return 0.0
+    try:
+        pause_ms = float(value)
+    except ValueError:
+        raise RuntimeError(
+            f"MCP_PAUSE_MS must be a number of milliseconds, got {value!r}."
+        ) from None
+    if not math.isfinite(pause_ms) or pause_ms < 0:
+        raise RuntimeError(
+            f"MCP_PAUSE_MS must be a non-negative number of milliseconds, got {value!r}."
+        )
+    return pause_ms / 1000.0
+
+
 # Configure PyAutoGUI for predictable behaviour.
 if pyautogui is not None:
     pyautogui.FAILSAFE = True  # Move the cursor to the top-left corner to abort.
-    pyautogui.PAUSE = 0.05
+    # Tools already pace themselves through their ``interval``/``duration``
+    # arguments, so PyAutoGUI's blanket per-call pause is off unless requested.
+    pyautogui.PAUSE = _pause_from_environment()
+
+# uvloop (libuv) has a cheaper I/O path than asyncio's selector loop. FastMCP
+# runs its transport through ``anyio.run``, whose asyncio backend creates the
+# loop from the current policy.
+if os.environ.get("MCP_USE_UVLOOP", "1") != "0" and sys.version_info < (3, 14):
+    try:
+        import uvloop
+    except ImportError:  # pragma: no cover - optional dependency
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 mcp = FastMCP("MacOS Automation Server")
 
 
-def _capture_screenshot_via_screencapture(
-    region: Optional[Tuple[int, int, int, int]]
+def _read_file(path: Path) -> bytes:
+    """Read ``path`` with a single ``os.read`` into an exactly sized buffer."""
+
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+
+
+async def _capture_screenshot_via_screencapture(
+    region: Optional[Tuple[int, int, int, int]], image_format: ImageFormat = "png"
 ) -> bytes:
-    """Capture a screenshot using macOS's ``screencapture`` utility."""
+    """Capture a screenshot using macOS's ``screencapture`` utility.
+
+    The command runs as an asyncio subprocess and the file is read and
+    converted in a worker thread, so other tool calls keep being served while
+    it is capturing.
+    """
 
     if sys.platform != "darwin":
         raise RuntimeError(
             "The 'screencapture' fallback is only available on macOS."
         )
 
-    command = ["screencapture", "-x"]
+    file_type = _SCREENCAPTURE_TYPES.get(image_format, "png")
+    command = ["screencapture", "-x", "-t", file_type]
     if region is not None:
         command.append(
             f"-R{region[0]},{region[1]},{region[2]},{region[3]}"
         )
 
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_file:
+    with tempfile.NamedTemporaryFile(suffix=f".{file_type}", delete=False) as temp_file:
         temp_path = Path(temp_file.name)
 
     try:
         command.append(str(temp_path))
         try:
-            subprocess.run(
-                command,
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
             )
         except FileNotFoundError as exc:  # pragma: no cover - requires macOS binary
             raise RuntimeError(
-                "The 'screencapture' command is required for screenshots when PyAutoGUI is unavailable."
+                "The 'screencapture' command is required for the macOS screenshot backend."
             ) from exc
-        except subprocess.CalledProcessError as exc:
-            stderr_output = (
-                exc.stderr.decode("utf-8", "ignore") if exc.stderr else ""
-            )
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            # Do not leave the child running (or writing into the file removed below).
+            try:
+                process.kill()
+            except ProcessLookupError:  # pragma: no cover - exited meanwhile
+                pass
+            await process.wait()
+            raise
+        if process.returncode != 0:
+            stderr_output = stderr.decode("utf-8", "ignore") if stderr else ""
             message = "The 'screencapture' command failed."
             if stderr_output.strip():
                 message += f" Details: {stderr_output.strip()}"
-            raise RuntimeError(message) from exc
-        return temp_path.read_bytes()
+            raise RuntimeError(message)
+        image_bytes = await asyncio.to_thread(_read_file, temp_path)
     finally:
         try:
             temp_path.unlink()
         except FileNotFoundError:  # pragma: no cover - best effort cleanup
             pass
 
+    if image_format not in _SCREENCAPTURE_TYPES:
+        image_bytes = await asyncio.to_thread(_convert_png, image_bytes, image_format)
+    return image_bytes
+
+
+def _encode_image(
+    image: PIL.Image.Image, image_format: ImageFormat, raw: Optional[bytes] = None
+) -> bytes:
+    """Encode a Pillow image in ``image_format``.
+
+    JPEG and WebP use fast settings (no ``optimize`` second pass, WebP
+    ``method=0``) since screenshots are consumed immediately.
+    """
+
+    if image_format == "png":
+        return _encode_png(image, raw)
+
+    if image_format == "jpeg":
+        return _save_image(image.convert("RGB"), format="JPEG", quality=85, optimize=False)
+    return _save_image(image, format="WEBP", quality=80, method=0)
+
+
+def _save_image(image: PIL.Image.Image, **params: Any) -> bytes:
+    """Save ``image`` with Pillow and return the encoded bytes."""
+
+    buffer = io.BytesIO()
+    image.save(buffer, **params)
+    return buffer.getvalue()
+
+
+def _convert_png(png_bytes: bytes, image_format: ImageFormat) -> bytes:
+    """Re-encode PNG output from a PNG-only backend in ``image_format``."""
+
+    if image_format == "png":
+        return png_bytes
+    try:
+        from PIL import Image as PILImage
+    except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError(
+            f"The 'Pillow' package is required for {image_format} screenshots."
+        ) from exc
+    with PILImage.open(io.BytesIO(png_bytes)) as image:
+        return _encode_image(image, image_format)
+
+
+def _encode_png(image: PIL.Image.Image, raw: Optional[bytes] = None) -> bytes:
+    """Encode a Pillow image as PNG bytes.
+
+    The raw pixel buffer is handed to :mod:`fpng_py` or an encode-capable
+    :mod:`pyspng` when installed; if neither is available or they fail, Pillow's
+    built-in encoder is used. ``raw`` may be passed when the caller already holds
+    ``image.tobytes()``.
+    """
+
+    channels = _FAST_PNG_CHANNELS.get(image.mode)
+    if channels is not None and (_fpng is not None or _pyspng is not None):
+        width, height = image.size
+        if raw is None:
+            raw = image.tobytes()
+        if _fpng is not None:
+            try:
+                return _fpng.fpng_encode_image_to_memory(raw, width, height, channels)
+            except Exception:  # pragma: no cover - encoder specific failures
+                pass
+        if _pyspng is not None:
+            try:
+                pixels = _np.frombuffer(raw, dtype=_np.uint8).reshape(height, width, channels)
+                return _pyspng.encode(pixels, compress_level=1)
+            except Exception:  # pragma: no cover - encoder specific failures
+                pass
+
+    return _save_image(image, format="PNG")
+
+
+def _cache_lookup(key: tuple) -> Optional[bytes]:
+    with _screenshot_cache_lock:
+        cached = _screenshot_cache.get(key)
+        if cached is not None:
+            _screenshot_cache.move_to_end(key)
+        return cached
+
+
+def _cache_store(key: tuple, encoded: bytes) -> None:
+    with _screenshot_cache_lock:
+        _screenshot_cache[key] = encoded
+        while len(_screenshot_cache) > _SCREENSHOT_CACHE_SIZE:
+            _screenshot_cache.popitem(last=False)
+
+
+def _hash_cache_pays_off(image_format: ImageFormat) -> bool:
+    """Whether hashing a frame is cheaper than the encode a cache hit would skip.
+
+    ``tobytes()`` plus a digest costs about 60 ms on a 4K frame: well below
+    Pillow's PNG (~400 ms) and WebP (~280 ms) encoders, but more than an fpng
+    (~50 ms) or JPEG (~30 ms) encode.
+    """
+
+    if image_format == "png":
+        return _fpng is None
+    return image_format == "webp"
+
+
+def _encode_image_cached(
+    image: PIL.Image.Image,
+    region: Optional[Tuple[int, int, int, int]],
+    image_format: ImageFormat = "png",
+) -> bytes:
+    """Encode ``image`` in ``image_format``, reusing the result for an unchanged frame.
+
+    The key holds the full ``(x, y, width, height)`` region, not just its size, so
+    equally sized regions at different positions never share an entry. Frames
+    are only hashed when that is cheaper than encoding them again.
+    """
+
+    if not _hash_cache_pays_off(image_format):
+        return _encode_image(image, image_format)
+
+    raw = image.tobytes()
+    if _blake3 is not None:
+        digest = _blake3(raw).digest()
+    else:
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+    key = (region, image_format, image.mode, image.size, digest)
+    cached = _cache_lookup(key)
+    if cached is not None:
+        return cached
+
+    encoded = _encode_image(image, image_format, raw)
+    _cache_store(key, encoded)
+    return encoded
+
+
+@functools.lru_cache(maxsize=None)
+def _screen_stream_output_class() -> type:
+    """Define (once) the Objective-C object receiving ScreenCaptureKit frames."""
+
+    import objc
+    from Foundation import NSObject
+
+    class MCPScreenStreamOutput(
+        NSObject,
+        protocols=[
+            objc.protocolNamed("SCStreamOutput"),
+            objc.protocolNamed("SCStreamDelegate"),
+        ],
+    ):
+        def stream_didOutputSampleBuffer_ofType_(self, stream, sample_buffer, output_type):
+            owner = self.owner
+            if owner is not None:
+                owner._on_frame(sample_buffer, output_type)
+
+        def stream_didStopWithError_(self, stream, error):
+            owner = self.owner
+            if owner is not None:
+                owner._on_stop(error)
+
+    return MCPScreenStreamOutput
+
+
+class _ScreenStreamUnavailable(RuntimeError):
+    """ScreenCaptureKit cannot be used in this process (wrong platform or no bindings)."""
+
+
+class _ScreenStream:
+    """Long-lived ScreenCaptureKit stream of the main display.
+
+    Setting up ScreenCaptureKit (shareable content, filter, configuration) is
+    expensive, so the stream is started on first use and kept running. Only the
+    most recent frame is retained and it is encoded on demand.
+    """
+
+    _instance: Optional["_ScreenStream"] = None
+    _instance_error: Optional[str] = None
+    _instance_lock = threading.Lock()
+    _retry_error: Optional[str] = None
+    _retry_at = 0.0
+    _retry_backoff = 0.0
+
+    @classmethod
+    def grab(
+        cls, region: Optional[Tuple[int, int, int, int]], image_format: ImageFormat = "png"
+    ) -> bytes:
+        """Return the latest frame (cropped to ``region``) encoded as ``image_format``."""
+
+        with cls._instance_lock:
+            if cls._instance_error is not None:
+                raise RuntimeError(cls._instance_error)
+            if cls._instance is None:
+                now = time.monotonic()
+                if now < cls._retry_at:
+                    raise RuntimeError(
+                        f"{cls._retry_error} Retrying in {cls._retry_at - now:.0f} s."
+                    )
+                try:
+                    cls._instance = cls()
+                except _ScreenStreamUnavailable as exc:
+                    cls._instance_error = str(exc)
+                    raise
+                except AttributeError as exc:
+                    # macOS releases without (parts of) ScreenCaptureKit lack symbols.
+                    cls._instance_error = f"ScreenCaptureKit is not supported here: {exc}"
+                    raise RuntimeError(cls._instance_error) from exc
+                except Exception as exc:
+                    # Timeouts (e.g. while the Screen Recording prompt is shown),
+                    # start failures and PyObjC errors may clear up, so retry after
+                    # a growing delay.
+                    cls._retry_backoff = min(
+                        max(cls._retry_backoff * 2, _SCREEN_STREAM_RETRY_INITIAL),
+                        _SCREEN_STREAM_RETRY_MAX,
+                    )
+                    cls._retry_error = (
+                        str(exc)
+                        if isinstance(exc, RuntimeError)
+                        else f"ScreenCaptureKit setup failed: {exc}"
+                    )
+                    cls._retry_at = now + cls._retry_backoff
+                    if isinstance(exc, RuntimeError):
+                        raise
+                    raise RuntimeError(cls._retry_error) from exc
+                cls._retry_backoff = 0.0
+                atexit.register(cls._instance.stop)
+            instance = cls._instance
+        try:
+            return instance._grab(region, image_format)
+        except RuntimeError:
+            raise
+        except Exception as exc:  # pragma: no cover - backend specific failures
+            raise RuntimeError(f"The ScreenCaptureKit screenshot backend failed: {exc}") from exc
+
+    def __init__(self) -> None:
+        if sys.platform != "darwin":
+            raise _ScreenStreamUnavailable("The ScreenCaptureKit backend is only available on macOS.")
+        try:
+            import CoreMedia
+            import Quartz
+            import ScreenCaptureKit
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise _ScreenStreamUnavailable(
+                f"The PyObjC ScreenCaptureKit bindings are not available: {exc}"
+            ) from exc
+
+        self._frame = None
+        self._frame_number = 0
+        self._frame_lock = threading.Lock()
+        self._frame_ready = threading.Event()
+
+        content_ready = threading.Event()
+        content_result: List[object] = [None, None]
+
+        def on_content(content, error) -> None:
+            content_result[:] = [content, error]
+            content_ready.set()
+
+        ScreenCaptureKit.SCShareableContent.getShareableContentWithCompletionHandler_(
+            on_content
+        )
+        if not content_ready.wait(_SCREEN_STREAM_TIMEOUT):
+            raise RuntimeError("ScreenCaptureKit did not return shareable content in time.")
+        content, error = content_result
+        if content is None:
+            raise RuntimeError(f"ScreenCaptureKit could not list displays: {error}")
+
+        main_display_id = Quartz.CGMainDisplayID()
+        display = next(
+            (item for item in content.displays() if item.displayID() == main_display_id),
+            None,
+        )
+        if display is None:
+            raise RuntimeError("ScreenCaptureKit did not report the main display.")
+
+        # Capture at the display's native pixel size (2x on Retina) so frames match
+        # ``screencapture``/PyAutoGUI output. Regions arrive in points, the mouse
+        # coordinate space, and are scaled into pixels when cropping.
+        display_mode = Quartz.CGDisplayCopyDisplayMode(main_display_id)
+        pixel_width = Quartz.CGDisplayModeGetPixelWidth(display_mode)
+        pixel_height = Quartz.CGDisplayModeGetPixelHeight(display_mode)
+        self._display_size = (display.width(), display.height())
+        self._scale_x = pixel_width / display.width()
+        self._scale_y = pixel_height / display.height()
+
+        configuration = ScreenCaptureKit.SCStreamConfiguration.alloc().init()
+        configuration.setWidth_(pixel_width)
+        configuration.setHeight_(pixel_height)
+        configuration.setPixelFormat_(Quartz.kCVPixelFormatType_32BGRA)
+        configuration.setMinimumFrameInterval_(CoreMedia.CMTimeMake(1, _SCREEN_STREAM_FPS))
+        configuration.setShowsCursor_(False)
+
+        content_filter = ScreenCaptureKit.SCContentFilter.alloc().initWithDisplay_excludingWindows_(
+            display, []
+        )
+        self._output = _screen_stream_output_class().alloc().init()
+        self._output.owner = self
+        self._abandoned = False
+        self._stream = ScreenCaptureKit.SCStream.alloc().initWithFilter_configuration_delegate_(
+            content_filter, configuration, self._output
+        )
+        try:
+            added, error = self._stream.addStreamOutput_type_sampleHandlerQueue_error_(
+                self._output, ScreenCaptureKit.SCStreamOutputTypeScreen, None, None
+            )
+            if not added:
+                raise RuntimeError(f"ScreenCaptureKit rejected the stream output: {error}")
+
+            started = threading.Event()
+            start_error: List[object] = [None]
+
+            def on_start(error) -> None:
+                start_error[0] = error
+                started.set()
+                # A start that completes after we timed out must not keep running.
+                if self._abandoned and error is None:
+                    self.stop()
+
+            self._stream.startCaptureWithCompletionHandler_(on_start)
+            if not started.wait(_SCREEN_STREAM_TIMEOUT):
+                raise RuntimeError("ScreenCaptureKit did not start the stream in time.")
+            if start_error[0] is not None:
+                raise RuntimeError(f"ScreenCaptureKit failed to start: {start_error[0]}")
+        except BaseException:
+            self._abandon()
+            raise
+
+    def _on_frame(self, sample_buffer, output_type) -> None:
+        import CoreMedia
+        import ScreenCaptureKit
+
+        if output_type != ScreenCaptureKit.SCStreamOutputTypeScreen:
+            return
+        # Idle/blank status frames carry no pixels; keep the last complete one.
+        attachments = CoreMedia.CMSampleBufferGetSampleAttachmentsArray(sample_buffer, False)
+        if not attachments:
+            return
+        status = attachments[0].get(ScreenCaptureKit.SCStreamFrameInfoStatus)
+        if status != ScreenCaptureKit.SCFrameStatusComplete:
+            return
+        with self._frame_lock:
+            self._frame = sample_buffer
+            self._frame_number += 1
+        self._frame_ready.set()
+
+    def _on_stop(self, error) -> None:
+        with type(self)._instance_lock:
+            if type(self)._instance is self:
+                type(self)._instance = None
+
+    def _grab(
+        self, region: Optional[Tuple[int, int, int, int]], image_format: ImageFormat
+    ) -> bytes:
+        import CoreMedia
+        import Quartz
+
+        # Only the main display is streamed; ``crop`` would pad anything outside
+        # it with black, so leave other displays to ``screencapture -R``.
+        if region is not None:
+            x, y, region_width, region_height = region
+            display_width, display_height = self._display_size
+            if x < 0 or y < 0 or x + region_width > display_width or y + region_height > display_height:
+                raise RuntimeError(
+                    "The requested region is outside the main display captured by ScreenCaptureKit."
+                )
+
+        try:
+            from PIL import Image as PILImage
+        except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("The 'Pillow' package is not installed.") from exc
+
+        if not self._frame_ready.wait(_SCREEN_STREAM_TIMEOUT):
+            raise RuntimeError("ScreenCaptureKit did not deliver a frame in time.")
+        with self._frame_lock:
+            sample_buffer = self._frame
+            frame_number = self._frame_number
+
+        # Complete frames only arrive when the screen changes, so the frame number
+        # identifies the pixels without hashing them.
+        key = ("stream", id(self), frame_number, region, image_format)
+        cached = _cache_lookup(key)
+        if cached is not None:
+            return cached
+
+        pixel_buffer = CoreMedia.CMSampleBufferGetImageBuffer(sample_buffer)
+        if pixel_buffer is None:
+            raise RuntimeError("ScreenCaptureKit delivered a frame without pixel data.")
+        Quartz.CVPixelBufferLockBaseAddress(pixel_buffer, Quartz.kCVPixelBufferLock_ReadOnly)
+        try:
+            width = Quartz.CVPixelBufferGetWidth(pixel_buffer)
+            height = Quartz.CVPixelBufferGetHeight(pixel_buffer)
+            stride = Quartz.CVPixelBufferGetBytesPerRow(pixel_buffer)
+            pixels = Quartz.CVPixelBufferGetBaseAddress(pixel_buffer).as_buffer(stride * height)
+            image = PILImage.frombuffer("RGB", (width, height), pixels, "raw", "BGRX", stride, 1)
+            if region is not None:
+                x, y, region_width, region_height = region
+                image = image.crop(
+                    (
+                        round(x * self._scale_x),
+                        round(y * self._scale_y),
+                        round((x + region_width) * self._scale_x),
+                        round((y + region_height) * self._scale_y),
+                    )
+                )
+            encoded = _encode_image(image, image_format)
+        finally:
+            Quartz.CVPixelBufferUnlockBaseAddress(pixel_buffer, Quartz.kCVPixelBufferLock_ReadOnly)
+        _cache_store(key, encoded)
+        return encoded
+
+    def _abandon(self) -> None:
+        """Tear down a stream whose setup failed so it cannot keep capturing."""
+
+        self._abandoned = True
+        self._output.owner = None
+        self.stop()
+
+    def stop(self) -> None:
+        """Stop the underlying stream; called automatically at interpreter exit."""
+
+        try:
+            self._stream.stopCaptureWithCompletionHandler_(None)
+        except Exception:  # pragma: no cover - best effort cleanup
+            pass
+
+
+_BUTTON_MAP = {
+    spelling: name
+    for name in ("left", "right", "middle")
+    for spelling in (name, name.upper(), name.capitalize())
+}
+
 
 def _normalize_button(button: str) -> str:
-    normalized = button.lower()
-    if normalized not in {"left", "right", "middle"}:
+    try:
+        return _BUTTON_MAP[button]
+    except KeyError:
+        pass
+    normalized = _BUTTON_MAP.get(button.lower())
+    if normalized is None:
         raise ValueError("Button must be 'left', 'right', or 'middle'.")
     return normalized
 
@@ -91,8 +669,79 @@ def _require_pyautogui() -> ModuleType:
     return pyautogui
 
 
+def _missing_pyautogui(*args: object, **kwargs: object) -> None:
+    _require_pyautogui()
+
+
+# Bind the PyAutoGUI entry points once so tool calls skip the module lookup.
+if pyautogui is not None:
+    _move_to = pyautogui.moveTo
+    _click = pyautogui.click
+    _press = pyautogui.press
+    _hotkey = pyautogui.hotkey
+    _write = pyautogui.write
+    _mouse_down = pyautogui.mouseDown
+    _mouse_up = pyautogui.mouseUp
+    _screenshot = pyautogui.screenshot
+    _fail_safe_check = pyautogui.failSafeCheck
+else:  # pragma: no cover - informative import failure
+    _move_to = _click = _press = _hotkey = _write = _missing_pyautogui
+    _mouse_down = _mouse_up = _screenshot = _fail_safe_check = _missing_pyautogui
+
+
+def _fast_multi_click(
+    x: Optional[int],
+    y: Optional[int],
+    button: str,
+    clicks: int,
+    interval: float,
+    event_cache: Optional[Dict[str, Tuple[object, object]]] = None,
+) -> None:
+    """Post ``clicks`` clicks of ``button`` directly to the Quartz HID event tap.
+
+    The down/up events are built once and only their click-state field changes,
+    so macOS recognises the sequence as a double/triple click. Without a location
+    the clicks happen at the current cursor position. ``event_cache`` lets a batch
+    of clicks reuse the same event pair per button, moving it between locations.
+    """
+
+    down_type, up_type, cg_button = _QUARTZ_BUTTONS[button]
+    if x is None or y is None:
+        location = _quartz.CGEventGetLocation(_quartz.CGEventCreate(None))
+    else:
+        location = (x, y)
+        move = _quartz.CGEventCreateMouseEvent(
+            None, _quartz.kCGEventMouseMoved, location, _quartz.kCGMouseButtonLeft
+        )
+        _quartz.CGEventPost(_quartz.kCGHIDEventTap, move)
+
+    events = event_cache.get(button) if event_cache is not None else None
+    if events is None:
+        events = (
+            _quartz.CGEventCreateMouseEvent(None, down_type, location, cg_button),
+            _quartz.CGEventCreateMouseEvent(None, up_type, location, cg_button),
+        )
+        if event_cache is not None:
+            event_cache[button] = events
+    else:
+        for event in events:
+            _quartz.CGEventSetLocation(event, location)
+    down, up = events
+    start = time.perf_counter()
+    for count in range(1, clicks + 1):
+        _quartz.CGEventSetIntegerValueField(down, _quartz.kCGMouseEventClickState, count)
+        _quartz.CGEventSetIntegerValueField(up, _quartz.kCGMouseEventClickState, count)
+        _quartz.CGEventPost(_quartz.kCGHIDEventTap, down)
+        _quartz.CGEventPost(_quartz.kCGHIDEventTap, up)
+        if interval and count < clicks:
+            # Sleep towards an absolute deadline so per-click overhead does not drift.
+            remaining = start + count * interval - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+
+
 def _capture_screenshot_with_mss(
-    region: Optional[Tuple[int, int, int, int]]
+    region: Optional[Tuple[int, int, int, int]], image_format: ImageFormat = "png"
 ) -> bytes:
     """Capture a screenshot using the optional :mod:`mss` package."""
 
@@ -120,11 +769,19 @@ def _capture_screenshot_with_mss(
             raise RuntimeError(
                 f"The 'mss' screenshot backend failed: {exc}"
             ) from exc
+    if image_format == "png":
         return mss_tools.to_png(screenshot.rgb, screenshot.size)
+    try:
+        from PIL import Image as PILImage
+    except ModuleNotFoundError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError(
+            f"The 'Pillow' package is required for {image_format} screenshots."
+        ) from exc
+    return _encode_image(PILImage.frombytes("RGB", screenshot.size, screenshot.rgb), image_format)
 
 
 def _capture_screenshot_with_pillow(
-    region: Optional[Tuple[int, int, int, int]]
+    region: Optional[Tuple[int, int, int, int]], image_format: ImageFormat = "png"
 ) -> bytes:
     """Capture a screenshot using Pillow's :mod:`ImageGrab` module."""
 
@@ -145,61 +802,94 @@ def _capture_screenshot_with_pillow(
     except Exception as exc:  # pragma: no cover - backend specific failures
         raise RuntimeError(f"Pillow's ImageGrab backend failed: {exc}") from exc
 
-    buffer = io.BytesIO()
-    image.save(buffer, format="PNG")
-    return buffer.getvalue()
+    return _encode_image(image, image_format)
 
 
-@mcp.tool
-def get_screenshot(region: Optional[Sequence[int]] = None) -> str:
-    """Return a PNG screenshot encoded as a data URL.
+def _capture_screenshot_with_pyautogui(
+    region: Optional[Tuple[int, int, int, int]], image_format: ImageFormat = "png"
+) -> bytes:
+    """Capture a screenshot using :mod:`pyautogui`."""
+
+    try:
+        screenshot = _screenshot(region=region)
+    except Exception as exc:  # pragma: no cover - delegated to fallback
+        with _screenshot_cache_lock:
+            _screenshot_cache.clear()
+        raise RuntimeError(f"PyAutoGUI failed to capture the screen: {exc}") from exc
+    return _encode_image_cached(screenshot, region, image_format)
+
+
+async def _capture_screenshot(
+    region: Optional[Sequence[int]], image_format: ImageFormat = "png"
+) -> bytes:
+    """Capture the screen (or ``region`` of it) encoded as ``image_format``.
 
     If ``region`` is provided, it must contain ``[x, y, width, height]`` values.
-    The function attempts to use :mod:`pyautogui` when available and falls back to
-    optional backends such as :mod:`mss`, :mod:`PIL.ImageGrab`, or the macOS
+    On macOS a persistent ScreenCaptureKit stream is tried first. Otherwise the
+    function uses :mod:`pyautogui` when available and falls back to optional
+    backends such as :mod:`mss`, :mod:`PIL.ImageGrab`, or the macOS
     ``screencapture`` utility.
     """
 
+    if image_format not in _DATA_URL_PREFIXES:
+        raise ValueError("Format must be 'png', 'jpeg', or 'webp'.")
     if region is not None and len(region) != 4:
         raise ValueError("Region must contain exactly four integers: x, y, width, height.")
 
-    region_tuple: Optional[Tuple[int, int, int, int]] = (
-        tuple(int(value) for value in region) if region is not None else None
-    )
-    if region_tuple is not None:
-        x, y, width, height = region_tuple
+    region_tuple: Optional[Tuple[int, int, int, int]] = None
+    if region is not None:
+        x, y, width, height = (int(value) for value in region)
         if width <= 0 or height <= 0:
             raise ValueError("Width and height must be positive values.")
         region_tuple = (x, y, width, height)
 
     image_bytes: Optional[bytes] = None
     errors: List[str] = []
+    screencapture_tried = False
 
-    if pyautogui is not None:
+    # The synchronous backends (and their encoding) block, so they run in worker
+    # threads to keep the event loop free for other tool calls.
+
+    # On macOS read the persistent ScreenCaptureKit stream; failing that, let
+    # ``screencapture`` grab just the requested rectangle rather than having
+    # PyAutoGUI capture the full display and crop it.
+    if sys.platform == "darwin":
         try:
-            screenshot = pyautogui.screenshot(region=region_tuple)
-        except Exception as exc:  # pragma: no cover - delegated to fallback
-            errors.append(f"PyAutoGUI failed to capture the screen: {exc}")
-        else:
-            buffer = io.BytesIO()
-            screenshot.save(buffer, format="PNG")
-            image_bytes = buffer.getvalue()
-    else:
-        errors.append("PyAutoGUI is not installed.")
+            image_bytes = await asyncio.to_thread(_ScreenStream.grab, region_tuple, image_format)
+        except RuntimeError as exc:
+            errors.append(str(exc))
+        if image_bytes is None and region_tuple is not None:
+            screencapture_tried = True
+            try:
+                image_bytes = await _capture_screenshot_via_screencapture(region_tuple, image_format)
+            except RuntimeError as exc:
+                errors.append(str(exc))
 
-    if image_bytes is None:
-        for backend in (
+    if pyautogui is None:
+        errors.append("PyAutoGUI is not installed.")
+        backends = (_capture_screenshot_with_mss, _capture_screenshot_with_pillow)
+    else:
+        backends = (
+            _capture_screenshot_with_pyautogui,
             _capture_screenshot_with_mss,
             _capture_screenshot_with_pillow,
-            _capture_screenshot_via_screencapture,
-        ):
+        )
+
+    if image_bytes is None:
+        for backend in backends:
             try:
-                image_bytes = backend(region_tuple)
+                image_bytes = await asyncio.to_thread(backend, region_tuple, image_format)
             except RuntimeError as exc:
                 errors.append(str(exc))
             else:
                 break
 
+    if image_bytes is None and not screencapture_tried:
+        try:
+            image_bytes = await _capture_screenshot_via_screencapture(region_tuple, image_format)
+        except RuntimeError as exc:
+            errors.append(str(exc))
+
     if image_bytes is None:
         message = (
             "Unable to capture screenshot because none of the available backends succeeded."
@@ -212,17 +902,194 @@ def get_screenshot(region: Optional[Sequence[int]] = None) -> str:
             message += " Errors: " + "; ".join(unique_errors)
         raise RuntimeError(message)
 
-    encoded = base64.b64encode(image_bytes).decode("utf-8")
-    return f"data:image/png;base64,{encoded}"
+    return image_bytes
+
+
+@mcp.tool
+async def get_screenshot(
+    region: Optional[Sequence[int]] = None, format: ImageFormat = "png"
+) -> Image:
+    """Return a screenshot as binary image content.
+
+    If ``region`` is provided, it must contain ``[x, y, width, height]`` values.
+    ``format`` selects ``png`` (lossless), ``jpeg`` or ``webp``; the lossy formats
+    encode faster and are smaller, which suits OCR-style consumers.
+    """
+
+    return Image(data=await _capture_screenshot(region, format), format=format)
+
+
+@mcp.tool
+async def get_screenshot_data_url(
+    region: Optional[Sequence[int]] = None, format: ImageFormat = "png"
+) -> str:
+    """Return a screenshot encoded as a data URL.
+
+    Prefer :func:`get_screenshot`; this variant exists for clients that can only
+    consume string results.
+    """
+
+    image_bytes = await _capture_screenshot(region, format)
+    if _b64encode_as_string is not None:
+        encoded = _b64encode_as_string(image_bytes)
+    else:
+        encoded = _b64.b64encode(image_bytes).decode("ascii")
+    return _DATA_URL_PREFIXES[format] + encoded
+
+
+def _move_mouse(x: int, y: int, duration: float = 0.0) -> str:
+    _move_to(x, y, duration=max(0.0, duration))
+    return f"Mouse moved to ({x}, {y})."
+
+
+def _click_mouse(
+    x: Optional[int] = None,
+    y: Optional[int] = None,
+    button: str = "left",
+    clicks: int = 1,
+    interval: float = 0.0,
+    duration: float = 0.0,
+    event_cache: Optional[Dict[str, Tuple[object, object]]] = None,
+) -> str:
+    normalized_button = _normalize_button(button)
+    clicks = max(1, clicks)
+    interval = max(0.0, interval)
+    duration = max(0.0, duration)
+    # Batches (``event_cache`` given) send even single clicks through Quartz.
+    fast_path = clicks > 1 or event_cache is not None
+    if _quartz is not None and fast_path and duration == 0.0 and (x is None) == (y is None):
+        _fail_safe_check()
+        _fast_multi_click(x, y, normalized_button, clicks, interval, event_cache)
+    else:
+        _click(
+            x=x,
+            y=y,
+            clicks=clicks,
+            interval=interval,
+            button=normalized_button,
+            duration=duration,
+        )
+    location = f"({x}, {y})" if x is not None and y is not None else "current position"
+    return f"Clicked {button} button {clicks} time(s) at {location}."
+
+
+def _press_key(key: str, modifiers: Optional[List[str]] = None) -> str:
+    if modifiers:
+        sequence = [modifier.lower() for modifier in modifiers]
+        sequence.append(key)
+        _hotkey(*sequence)
+        pressed = " + ".join(sequence)
+    else:
+        _press(key)
+        pressed = key
+    return f"Pressed {pressed}."
+
+
+def _type_text(text: str, interval: float = 0.0, press_enter: bool = False) -> str:
+    _write(text, interval=max(0.0, interval))
+    if press_enter:
+        _press("enter")
+    return "Typed text successfully." if not press_enter else "Typed text and pressed Enter successfully."
+
+
+def _drag_and_drop(
+    start_x: int,
+    start_y: int,
+    end_x: int,
+    end_y: int,
+    duration: float = 0.5,
+    button: str = "left",
+) -> str:
+    normalized_button = _normalize_button(button)
+    _move_to(start_x, start_y)
+    _mouse_down(button=normalized_button)
+    _move_to(end_x, end_y, duration=max(0.0, duration))
+    _mouse_up(button=normalized_button)
+    return (
+        f"Dragged from ({start_x}, {start_y}) to ({end_x}, {end_y}) using the {normalized_button} button."
+    )
+
+
+# Action kinds accepted by ``perform_actions``.
+_OPS: Dict[str, Callable[..., str]] = {
+    "move": _move_mouse,
+    "click": _click_mouse,
+    "press": _press_key,
+    "type": _type_text,
+    "drag": _drag_and_drop,
+}
+# Top-level keys allowed in a ``perform_actions`` entry.
+_ACTION_KEYS = frozenset({"kind", "args"})
+
+
+@functools.lru_cache(maxsize=None)
+def _action_parameters(
+    operation: Callable[..., str]
+) -> Tuple[inspect.Signature, Dict[str, TypeAdapter]]:
+    """Return the public signature of an ``_OPS`` entry and a validator per parameter."""
+
+    signature = inspect.signature(operation)
+    hints = typing.get_type_hints(operation)
+    parameters = [
+        parameter for name, parameter in signature.parameters.items() if name != "event_cache"
+    ]
+    adapters = {parameter.name: TypeAdapter(hints[parameter.name]) for parameter in parameters}
+    return signature.replace(parameters=parameters), adapters
+
+
+def _validate_actions(
+    actions: Sequence[Any],
+) -> List[Tuple[Callable[..., str], Dict[str, Any]]]:
+    """Check a ``perform_actions`` batch and return ``(operation, kwargs)`` pairs."""
+
+    operations = []
+    for index, action in enumerate(actions):
+        if not isinstance(action, dict):
+            raise ValueError(f"Action {index} must be an object.")
+        unknown = sorted(repr(key) for key in action if key not in _ACTION_KEYS)
+        if unknown:
+            raise ValueError(
+                f"Action {index} has unknown keys {', '.join(unknown)}; "
+                "expected only 'kind' and 'args' (tool arguments go inside 'args')."
+            )
+        kind = action.get("kind")
+        if not isinstance(kind, str) or kind not in _OPS:
+            raise ValueError(
+                f"Action {index} has unknown kind {kind!r}; expected one of: " + ", ".join(_OPS)
+            )
+        args = action.get("args")
+        if args is None:
+            args = {}
+        elif not isinstance(args, dict):
+            raise ValueError(f"Action {index} 'args' must be an object.")
+
+        operation = _OPS[kind]
+        signature, adapters = _action_parameters(operation)
+        try:
+            bound = signature.bind(**args)
+        except TypeError as exc:
+            raise ValueError(f"Action {index} ({kind}): {exc}.") from None
+        validated: Dict[str, Any] = {}
+        for name, value in bound.arguments.items():
+            try:
+                validated[name] = adapters[name].validate_python(value)
+            except ValidationError as exc:
+                message = exc.errors()[0]["msg"]
+                raise ValueError(f"Action {index} ({kind}): invalid {name!r}: {message}.") from None
+        if "button" in validated:
+            try:
+                _normalize_button(validated["button"])
+            except ValueError as exc:
+                raise ValueError(f"Action {index} ({kind}): {exc}") from None
+        operations.append((operation, validated))
+    return operations
 
 
 @mcp.tool
 def move_mouse(x: int, y: int, duration: float = 0.0) -> str:
     """Move the mouse cursor to ``(x, y)`` over ``duration`` seconds."""
 
-    module = _require_pyautogui()
-    module.moveTo(x, y, duration=max(0.0, duration))
-    return f"Mouse moved to ({x}, {y})."
+    return _move_mouse(x, y, duration)
 
 
 @mcp.tool
@@ -239,43 +1106,21 @@ def click(
     If ``x`` and ``y`` are provided the click occurs at that location.
     """
 
-    module = _require_pyautogui()
-    module.click(
-        x=x,
-        y=y,
-        clicks=max(1, clicks),
-        interval=max(0.0, interval),
-        button=_normalize_button(button),
-        duration=max(0.0, duration),
-    )
-    location = f"({x}, {y})" if x is not None and y is not None else "current position"
-    return f"Clicked {button} button {clicks} time(s) at {location}."
+    return _click_mouse(x, y, button, clicks, interval, duration)
 
 
 @mcp.tool
 def press_key(key: str, modifiers: Optional[List[str]] = None) -> str:
     """Press a keyboard key, optionally including modifier keys."""
 
-    module = _require_pyautogui()
-    if modifiers:
-        sequence = [modifier.lower() for modifier in modifiers] + [key]
-        module.hotkey(*sequence)
-        pressed = " + ".join(sequence)
-    else:
-        module.press(key)
-        pressed = key
-    return f"Pressed {pressed}."
+    return _press_key(key, modifiers)
 
 
 @mcp.tool
 def type_text(text: str, interval: float = 0.0, press_enter: bool = False) -> str:
     """Type the provided text with an optional delay between characters."""
 
-    module = _require_pyautogui()
-    module.write(text, interval=max(0.0, interval))
-    if press_enter:
-        module.press("enter")
-    return "Typed text successfully." if not press_enter else "Typed text and pressed Enter successfully."
+    return _type_text(text, interval, press_enter)
 
 
 @mcp.tool
@@ -289,15 +1134,30 @@ def drag_and_drop(
 ) -> str:
     """Drag from the start coordinates to the end coordinates using the given mouse button."""
 
-    normalized_button = _normalize_button(button)
-    module = _require_pyautogui()
-    module.moveTo(start_x, start_y)
-    module.mouseDown(button=normalized_button)
-    module.moveTo(end_x, end_y, duration=max(0.0, duration))
-    module.mouseUp(button=normalized_button)
-    return (
-        f"Dragged from ({start_x}, {start_y}) to ({end_x}, {end_y}) using the {normalized_button} button."
-    )
+    return _drag_and_drop(start_x, start_y, end_x, end_y, duration, button)
+
+
+@mcp.tool
+def perform_actions(actions: List[Dict[str, Any]]) -> List[str]:
+    """Run a sequence of mouse/keyboard actions in a single call.
+
+    Each action is ``{"kind": ..., "args": {...}}`` where ``kind`` is one of
+    ``move``, ``click``, ``press``, ``type`` or ``drag`` and ``args`` holds the
+    keyword arguments of the matching tool. Returns one message per action.
+    """
+
+    # FastMCP only validates ``actions`` as a list of objects, so check the
+    # whole batch up front and fail before any input is sent.
+    operations = _validate_actions(actions)
+
+    event_cache: Dict[str, Tuple[object, object]] = {}
+    results: List[str] = []
+    for operation, args in operations:
+        if operation is _click_mouse:
+            results.append(operation(**args, event_cache=event_cache))
+        else:
+            results.append(operation(**args))
+    return results
 
 
 if __name__ == "__main__":
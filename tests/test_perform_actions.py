@@ -0,0 +1,111 @@
+"""Tests for the ``perform_actions`` batch validator."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastmcp")
+pytest.importorskip("pydantic")
+
+_SERVER_PATH = Path(__file__).resolve().parent.parent / "code.py"
+
+
+@pytest.fixture(scope="module")
+def server():
+    # ``code.py`` shadows the stdlib ``code`` module, so load it by path.
+    spec = importlib.util.spec_from_file_location("macos_mcp_server", _SERVER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except Exception as exc:  # e.g. PyAutoGUI failing to reach a display
+        pytest.skip(f"server module could not be imported: {exc}")
+    return module
+
+
+@pytest.fixture
+def sent(server, monkeypatch):
+    """Replace every input backend with a recorder and return the call log."""
+
+    calls = []
+
+    def recorder(name):
+        return lambda *args, **kwargs: calls.append((name, args, kwargs))
+
+    for name in (
+        "_move_to",
+        "_click",
+        "_press",
+        "_hotkey",
+        "_write",
+        "_mouse_down",
+        "_mouse_up",
+        "_fail_safe_check",
+    ):
+        monkeypatch.setattr(server, name, recorder(name))
+    monkeypatch.setattr(server, "_quartz", None)
+    return calls
+
+
+def _perform(server, actions):
+    tool = server.perform_actions
+    return getattr(tool, "fn", tool)(actions)
+
+
+def test_valid_batch_runs_in_order(server, sent):
+    results = _perform(
+        server,
+        [
+            {"kind": "move", "args": {"x": 10, "y": 20}},
+            {"kind": "press", "args": {"key": "enter"}},
+        ],
+    )
+    assert len(results) == 2
+    assert [name for name, _, _ in sent] == ["_move_to", "_press"]
+
+
+def test_args_are_coerced_to_annotated_types(server):
+    ((_, kwargs),) = server._validate_actions([{"kind": "move", "args": {"x": "5", "y": 6}}])
+    assert kwargs["x"] == 5 and isinstance(kwargs["x"], int)
+
+
+@pytest.mark.parametrize("action", [{"kind": "press", "args": None}, {"kind": "press"}])
+def test_missing_or_null_args_mean_no_arguments(server, action):
+    with pytest.raises(ValueError, match="missing a required argument: 'key'"):
+        server._validate_actions([action])
+
+
+def test_flattened_action_is_rejected(server, sent):
+    with pytest.raises(ValueError, match=r"Action 1 has unknown keys 'x', 'y'"):
+        _perform(
+            server,
+            [
+                {"kind": "move", "args": {"x": 1, "y": 1}},
+                {"kind": "click", "x": 100, "y": 200},
+            ],
+        )
+    assert sent == []
+
+
+@pytest.mark.parametrize("args", [[], "", 0, False, [("x", 1)]])
+def test_non_object_args_are_rejected(server, args):
+    with pytest.raises(ValueError, match="'args' must be an object"):
+        server._validate_actions([{"kind": "click", "args": args}])
+
+
+@pytest.mark.parametrize(
+    "action, message",
+    [
+        ("click", "must be an object"),
+        ({"kind": ["click"]}, "unknown kind"),
+        ({"kind": "scroll"}, "unknown kind"),
+        ({"kind": "move", "args": {"x": 1, "y": 2, "speed": 3}}, "unexpected keyword argument"),
+        ({"kind": "move", "args": {"x": "left", "y": 2}}, "invalid 'x'"),
+        ({"kind": "click", "args": {"event_cache": {}}}, "unexpected keyword argument"),
+        ({"kind": "click", "args": {"button": "side"}}, "Action 1 \\(click\\)"),
+    ],
+)
+def test_invalid_actions_fail_before_any_input(server, sent, action, message):
+    with pytest.raises(ValueError, match=message):
+        _perform(server, [{"kind": "press", "args": {"key": "a"}}, action])
+    assert sent == []